@@ -0,0 +1,74 @@
+"""
+Benchmark for naxos_reconcile.rules
+
+Times applying rules to Naxos MARC/XML records as the number of url and
+subfield rules grows. Per-record cost should stay roughly flat since rules are
+compiled into a single trie-based regex per subfield.
+
+Run from the root of the repo with: python -m benchmarks.rules_benchmark
+"""
+
+import copy
+import timeit
+import xml.etree.ElementTree as ET
+
+from naxos_reconcile.rules import RewriteRules
+
+MARC_NS = "{http://www.loc.gov/MARC21/slim}"
+RECORDS = 1000
+
+
+def make_record() -> ET.Element:
+    record = ET.Element(f"{MARC_NS}record")
+    ET.SubElement(record, f"{MARC_NS}controlfield", tag="001").text = "123456789"
+    for tag, code, text in [
+        ("024", "a", "0123456789"),
+        ("245", "a", "Symphonies nos. 1-9 / Beethoven"),
+        ("505", "a", "Very long formatted contents field " * 50),
+        (
+            "856",
+            "u",
+            "http://univportal.naxosmusiclibrary.com/catalogue/item.asp?cid=foo",
+        ),
+        ("856", "z", "Univ access only"),
+    ]:
+        field = ET.SubElement(record, f"{MARC_NS}datafield", tag=tag)
+        ET.SubElement(field, f"{MARC_NS}subfield", code=code).text = text
+    return record
+
+
+def make_rules(count: int) -> RewriteRules:
+    urls = [
+        {
+            "find": f"portal{i}.naxosmusiclibrary.com/catalogue/",
+            "replace": f"branch{i}.naxosmusiclibrary.com/catalogue/",
+        }
+        for i in range(count)
+    ]
+    urls.append(
+        {
+            "find": "univportal.naxosmusiclibrary.com",
+            "replace": "nypl.naxosmusiclibrary.com",
+        }
+    )
+    subfields = [
+        {"tag": "856", "code": "z", "find": f"Branch {i}", "replace": f"NYPL {i}"}
+        for i in range(count)
+    ]
+    return RewriteRules({"drop_tags": ["505"], "url": urls, "subfield": subfields})
+
+
+def main():
+    record = make_record()
+    print(f"{'rules':>6}  {'usec/record':>12}")
+    for count in [1, 10, 100, 250, 500]:
+        rules = make_rules(count)
+        records = [copy.deepcopy(record) for _ in range(RECORDS)]
+        seconds = timeit.timeit(
+            lambda: rules.edit_record(records.pop()), number=RECORDS
+        )
+        print(f"{count:>6}  {seconds / RECORDS * 1_000_000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,14 @@ import click
 
 from naxos_reconcile.prep import (
     combine_naxos_xml,
+    extract_naxos_csv,
     naxos_xml_to_marc,
     prep_naxos_csv,
     prep_sierra_csv,
     edit_naxos_xml,
 )
 from naxos_reconcile.reconcile import compare_files
+from naxos_reconcile.watch import NaxosWatcher
 
 
 @click.group()
@@ -20,18 +22,32 @@ def cli():
 
 @click.option("-s", "--sierra", "sierra_file", help="Sierra .csv file to process")
 @click.option("-n", "--naxos", "naxos_filepath", help="Path to Naxos files to process")
+@click.option(
+    "-r", "--rules", "rules_file", help="TOML file of rules to edit Naxos records"
+)
+@click.option(
+    "--csv-only",
+    "csv_only",
+    is_flag=True,
+    help="Only output prepped Naxos .csv file, skip XML and MARC21 output",
+)
 @cli.command("prep", short_help="Prep Sierra and/or Naxos file(s)")
-def prep_files(sierra_file, naxos_filepath):
+def prep_files(sierra_file, naxos_filepath, csv_only, rules_file):
     if sierra_file:
         print("Processing Sierra .csv file")
         sierra_csv = prep_sierra_csv(sierra_file)
         print("Finished processing Sierra file(s)")
         print(f"Prepped csv file is in {sierra_csv}")
-    if naxos_filepath:
+    if naxos_filepath and csv_only:
+        print("Converting Naxos XML files to csv")
+        naxos_csv = extract_naxos_csv(naxos_filepath, rules_file)
+        print("Finished processing Naxos file(s)")
+        print(f"Prepped csv is in  file is in {naxos_csv}")
+    elif naxos_filepath:
         print("Processing Naxos XML files")
         combined_xml = combine_naxos_xml(naxos_filepath)
         print(f"Combined Naxos .xml file is in {combined_xml}")
-        edited_xml = edit_naxos_xml(combined_xml)
+        edited_xml = edit_naxos_xml(combined_xml, rules_file)
         print(f"Edited Naxos .xml file is in {edited_xml}")
 
         print("Converting Naxos XML file to MARC21")
@@ -97,27 +113,40 @@ def compare_infiles(sierra, naxos):
 
 @click.option("-s", "--sierra", "sierra_file", help="Sierra .csv file to process")
 @click.option("-n", "--naxos", "naxos_filepath", help="Path to Naxos files to process")
+@click.option(
+    "-r", "--rules", "rules_file", help="TOML file of rules to edit Naxos records"
+)
+@click.option(
+    "--csv-only",
+    "csv_only",
+    is_flag=True,
+    help="Only output prepped Naxos .csv file, skip XML and MARC21 output",
+)
 @cli.command(
     "reconcile", short_help="Process Sierra and Naxos files and then compare them"
 )
-def reconcile_files(sierra_file, naxos_filepath):
+def reconcile_files(sierra_file, naxos_filepath, csv_only, rules_file):
     print("Processing Sierra .csv file")
     sierra_csv = prep_sierra_csv(sierra_file)
     print("Finished processing Sierra file(s)")
     print(f"Prepped csv file is in {sierra_csv}")
 
-    print("Processing Naxos XML files")
-    combined_xml = combine_naxos_xml(naxos_filepath)
-    print(f"Combined Naxos .xml file is in {combined_xml}")
-    edited_xml = edit_naxos_xml(combined_xml)
-    print(f"Edited Naxos .xml file is in {edited_xml}")
+    if csv_only:
+        print("Converting Naxos XML files to csv")
+        naxos_csv = extract_naxos_csv(naxos_filepath, rules_file)
+    else:
+        print("Processing Naxos XML files")
+        combined_xml = combine_naxos_xml(naxos_filepath)
+        print(f"Combined Naxos .xml file is in {combined_xml}")
+        edited_xml = edit_naxos_xml(combined_xml, rules_file)
+        print(f"Edited Naxos .xml file is in {edited_xml}")
 
-    print("Converting Naxos XML file to MARC21")
-    marc_file = naxos_xml_to_marc(edited_xml)
-    print(f"Naxos MARC21 file is in {marc_file}")
+        print("Converting Naxos XML file to MARC21")
+        marc_file = naxos_xml_to_marc(edited_xml)
+        print(f"Naxos MARC21 file is in {marc_file}")
 
-    print("Converting Naxos XML to csv")
-    naxos_csv = prep_naxos_csv(edited_xml)
+        print("Converting Naxos XML to csv")
+        naxos_csv = prep_naxos_csv(edited_xml)
     print("Finished processing Naxos file(s)")
     print(f"Prepped csv is in  file is in {naxos_csv}")
 
@@ -125,5 +154,68 @@ def reconcile_files(sierra_file, naxos_filepath):
     compare_files(sierra_file=sierra_csv, naxos_file=naxos_csv)
 
 
+@click.option(
+    "-n",
+    "--naxos",
+    "naxos_filepath",
+    required=True,
+    help="Path to watch for Naxos files",
+)
+@click.option(
+    "-o",
+    "--outdir",
+    "outdir",
+    help="Directory for prepped and compared files [default: NAXOS/prepped]",
+)
+@click.option(
+    "-s", "--sierra", "sierra", help="Prepped Sierra .csv file to compare with"
+)
+@click.option(
+    "-r", "--rules", "rules_file", help="TOML file of rules to edit Naxos records"
+)
+@click.option(
+    "-i",
+    "--interval",
+    "interval",
+    type=click.IntRange(min=1),
+    default=60,
+    show_default=True,
+    help="Seconds between checks for new files",
+)
+@click.option(
+    "-w",
+    "--workers",
+    "workers",
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help="Number of files to prep at once",
+)
+@click.option(
+    "-q",
+    "--queue-size",
+    "queue_size",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Maximum number of files waiting to be prepped",
+)
+@cli.command("watch", short_help="Prep new Naxos files as they are added")
+def watch_files(
+    naxos_filepath, outdir, sierra, rules_file, interval, workers, queue_size
+):
+    print(f"Watching {naxos_filepath} for Naxos files")
+    watcher = NaxosWatcher(
+        naxos_filepath,
+        outdir=outdir,
+        sierra_file=sierra,
+        rules_file=rules_file,
+        workers=workers,
+        queue_size=queue_size,
+    )
+    print(f"Prepped csv is in {watcher.naxos_csv}")
+    watcher.run(interval)
+
+
 def main():
     cli()
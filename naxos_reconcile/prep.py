@@ -1,9 +1,11 @@
 import os
 import csv
 import xml.etree.ElementTree as ET
+from typing import Iterator
 
 from pymarc import MARCWriter, parse_xml_to_array
 
+from naxos_reconcile.rules import RewriteRules
 from naxos_reconcile.utils import out_file, save_csv
 
 MARC_NS = "{http://www.loc.gov/MARC21/slim}"
@@ -48,33 +50,29 @@ def combine_naxos_xml(dir: str) -> str:
     return combined_xml
 
 
-def edit_naxos_xml(file: str) -> str:
+def edit_naxos_xml(file: str, rules_file: str | None = None) -> str:
     """
-    Reads combined MARC/XML file and edits fields.
-    Removes 505 to shorten records and edits url in 856$u.
-    Writes records to new file and any records missing 856 fields
-    are written to an error file.
+    Reads combined MARC/XML file and edits fields using rules from a rules file.
+    By default 505 fields are removed to shorten records and urls in 856$u are
+    edited. Writes records to new file.
+
+    Args:
+
+        file: file path for MARCXML file to process
+        rules_file: file path for TOML rules file (optional)
+    Returns:
+
+        name of processed .xml file as str
     """
     edited_xml = out_file("edited_naxos.xml")
+    rules = RewriteRules.from_file(rules_file)
 
     ET.register_namespace("marc", MARC_NS)
     tree = ET.parse(file)
     root = tree.getroot()
 
     for record in root.findall(f"./{MARC_NS}record"):
-        marc_505 = record.findall(f"./{MARC_NS}datafield[@tag='505']")
-        for field_505 in marc_505:
-            record.remove(field_505)
-        marc_urls = [
-            i
-            for i in record.findall(
-                f"./{MARC_NS}datafield[@tag='856']/{MARC_NS}subfield[@code='u']"
-            )
-        ]
-        for url in marc_urls:
-            if url.text is not None and isinstance(url.text, str):
-                new_url = url.text.replace("univportal", "nypl")
-                url.text = new_url
+        rules.edit_record(record)
     tree.write(
         edited_xml,
         encoding="utf-8",
@@ -132,6 +130,78 @@ def prep_naxos_csv(file: str) -> str:
     return naxos_csv
 
 
+def read_naxos_file(file: str, rules: RewriteRules) -> Iterator[list]:
+    """
+    Reads a Naxos MARC/XML file and yields data for each 856$u that contains
+    a CID. Only the 001 and 856$u are read, all other fields are discarded as
+    the file is parsed. URLs are edited using the given rules and 001 and 856
+    fields are skipped if their tag is dropped by the rules, so the output is
+    the same as `edit_naxos_xml` followed by `prep_naxos_csv`.
+
+    Args:
+
+        file: file path for MARCXML file to process
+        rules: rules to use to edit URLs
+    Yields:
+
+        URL, control number and CID as list
+    """
+    control_no: list = []
+    urls: list = []
+    in_856 = False
+    context = ET.iterparse(file, events=("start", "end"))
+    event, root = next(context)
+    for event, elem in context:
+        if event == "start":
+            if elem.tag == f"{MARC_NS}datafield":
+                in_856 = elem.get("tag") == "856" and "856" not in rules.drop_tags
+            continue
+        if elem.tag == f"{MARC_NS}subfield":
+            if in_856 and elem.get("code") == "u" and elem.text is not None:
+                urls.append(rules.edit_subfield("856", "u", elem.text))
+        elif elem.tag == f"{MARC_NS}controlfield":
+            if elem.get("tag") == "001" and "001" not in rules.drop_tags:
+                control_no.append(elem.text)
+            elem.clear()
+        elif elem.tag == f"{MARC_NS}datafield":
+            in_856 = False
+            elem.clear()
+        elif elem.tag == f"{MARC_NS}record":
+            urls = [i for i in urls if "?cid=" in i]
+            if len(control_no) == 1 and len(urls) >= 1:
+                for url in urls:
+                    yield [url, control_no[0], str(url.split("?cid=")[1].strip())]
+            control_no = []
+            urls = []
+            root.clear()
+
+
+def extract_naxos_csv(dir: str, rules_file: str | None = None) -> str:
+    """
+    Reads Naxos MARC/XML files and writes data for each 856$u to a csv file
+    without combining, editing or converting the records. URLs are edited
+    using the same rules as in `edit_naxos_xml`.
+
+    Args:
+
+        dir: file path for MARCXML files to process
+        rules_file: file path for TOML rules file (optional)
+    Returns:
+
+        name of processed .csv file as str
+
+    """
+    naxos_csv = out_file("prepped_naxos_data.csv")
+    rules = RewriteRules.from_file(rules_file)
+
+    file_list = os.listdir(dir)
+    for file in file_list:
+        if ".xml" in file:
+            for row in read_naxos_file(f"{dir}/{file}", rules):
+                save_csv(naxos_csv, row)
+    return naxos_csv
+
+
 def prep_sierra_csv(infile: str) -> str:
     """
     Reads a csv file and splits rows with multiple urls into separate rows.
@@ -10,30 +10,53 @@ def get_url_status(url: str) -> int:
     return response.status_code
 
 
-def compare_files(sierra_file: str, naxos_file: str):
-    """compare prepped files"""
-    # create output files
-    check_csv = out_file("combined_urls_to_check.csv")
-    delete_csv = out_file("records_to_delete.csv")
-    import_csv = out_file("records_to_import.csv")
-
-    # read input files into dataframes
-    sierra_df = pd.read_csv(
-        sierra_file,
+def read_sierra_csv(file: str) -> pd.DataFrame:
+    """read prepped Sierra file into a dataframe"""
+    return pd.read_csv(
+        file,
         header=None,
         names=["OCLC_NUMBER", "BIB_ID", "URL_SIERRA", "CID_SIERRA"],
         dtype=str,
     )
-    naxos_df = pd.read_csv(
-        naxos_file,
+
+
+def read_naxos_csv(file: str) -> pd.DataFrame:
+    """read prepped Naxos file into a dataframe"""
+    return pd.read_csv(
+        file,
         header=None,
         names=["URL_NAXOS", "CONTROL_NO", "CID_NAXOS"],
         dtype=str,
     )
 
+
+def compare_files(sierra_file: str, naxos_file: str):
+    """compare prepped files"""
+    compare_dataframes(
+        sierra_df=read_sierra_csv(sierra_file), naxos_df=read_naxos_csv(naxos_file)
+    )
+
+
+def compare_dataframes(
+    sierra_df: pd.DataFrame, naxos_df: pd.DataFrame, outdir: str | None = None
+):
+    """
+    compare prepped Sierra and Naxos data, output is written to `outdir` or
+    to the dated output directory if no `outdir` is given
+    """
+    # create output files
+    if outdir:
+        check_csv = f"{outdir}/combined_urls_to_check.csv"
+        delete_csv = f"{outdir}/records_to_delete.csv"
+        import_csv = f"{outdir}/records_to_import.csv"
+    else:
+        check_csv = out_file("combined_urls_to_check.csv")
+        delete_csv = out_file("records_to_delete.csv")
+        import_csv = out_file("records_to_import.csv")
+
     # drop duplicate rows, just in case
-    sierra_df.drop_duplicates(inplace=True)
-    naxos_df.drop_duplicates(inplace=True)
+    sierra_df = sierra_df.drop_duplicates()
+    naxos_df = naxos_df.drop_duplicates()
 
     # merge dataframes with an inner join and keep only exact matches
     check_df = sierra_df.merge(naxos_df, left_on="CID_SIERRA", right_on="CID_NAXOS")
@@ -0,0 +1,159 @@
+import os
+import re
+import tomllib
+import xml.etree.ElementTree as ET
+
+MARC_NS = "{http://www.loc.gov/MARC21/slim}"
+
+DEFAULT_RULES = os.path.join(os.path.dirname(__file__), "rules.toml")
+
+
+def trie_pattern(words: list) -> str:
+    """
+    Builds a regex pattern that matches any of the given strings. The strings
+    are combined into a trie so that shared prefixes are only tested once and
+    the cost of a match does not grow with the number of strings. When one
+    string is a prefix of another the longest string is matched.
+
+    Args:
+        words: list of literal strings to match
+
+    Returns:
+        regex pattern as str
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def _pattern(node: dict) -> str:
+        end = "" in node
+        branches = [re.escape(char) + _pattern(node[char]) for char in node if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not end:
+            return branches[0]
+        pattern = f"(?:{'|'.join(branches)})"
+        if end:
+            pattern += "?"
+        return pattern
+
+    return _pattern(trie)
+
+
+def check_rule(kind: str, rule: dict, keys: list) -> None:
+    """
+    Checks that a rule from a rules file has a str value for each key and
+    that `find` is not empty.
+
+    Raises:
+        ValueError: if the rule is not valid
+    """
+    for key in keys:
+        if not isinstance(rule.get(key), str):
+            raise ValueError(f"Invalid {kind} rule {rule!r}: {key!r} must be a str")
+    if not rule["find"]:
+        raise ValueError(f"Invalid {kind} rule {rule!r}: 'find' must not be empty")
+
+
+class RewriteRules:
+    """
+    Rules used to edit Naxos MARC/XML records. Rules are read from a TOML file
+    and compiled once so that they can be applied to each record.
+
+    Rules files can contain:
+        drop_tags: list of tags of fields to remove from records
+        [[url]]: rewrites of the host and/or path of URLs in 856$u. `find` is
+            matched case-insensitively against the start of the URL following
+            the scheme (eg. "univportal.naxosmusiclibrary.com") and replaced
+            with `replace`. A `find` without a path only matches a whole host.
+        [[subfield]]: rewrites of the text of a subfield. Each occurrence of
+            `find` in the `code` subfield of `tag` fields is replaced with
+            `replace`
+    """
+
+    def __init__(self, rules: dict):
+        unknown = set(rules) - {"drop_tags", "url", "subfield"}
+        if unknown:
+            raise ValueError(f"Invalid rules file: unknown keys {sorted(unknown)!r}")
+        for kind in ["url", "subfield"]:
+            value = rules.get(kind, [])
+            if not isinstance(value, list) or not all(
+                isinstance(i, dict) for i in value
+            ):
+                raise ValueError(
+                    f"Invalid {kind} rules {value!r}: must be a list of tables"
+                )
+
+        drop_tags = rules.get("drop_tags", [])
+        if not isinstance(drop_tags, list) or not all(
+            isinstance(i, str) for i in drop_tags
+        ):
+            raise ValueError(f"Invalid drop_tags {drop_tags!r}: must be a list of str")
+        self.drop_tags = set(drop_tags)
+
+        for rule in rules.get("url", []):
+            check_rule("url", rule, ["find", "replace"])
+        for rule in rules.get("subfield", []):
+            check_rule("subfield", rule, ["tag", "code", "find", "replace"])
+
+        self.urls = {i["find"].lower(): i["replace"] for i in rules.get("url", [])}
+        self.url_pattern = None
+        if self.urls:
+            hosts = [i for i in self.urls if "/" not in i]
+            paths = [i for i in self.urls if "/" in i]
+            finds = []
+            if paths:
+                finds.append(trie_pattern(paths))
+            if hosts:
+                finds.append(f"{trie_pattern(hosts)}(?=[/:?#]|$)")
+            self.url_pattern = re.compile(
+                rf"^(https?://)({'|'.join(finds)})", re.IGNORECASE
+            )
+
+        subfields: dict = {}
+        for rule in rules.get("subfield", []):
+            key = (rule["tag"], rule["code"])
+            subfields.setdefault(key, {})[rule["find"]] = rule["replace"]
+        self.subfields = {
+            key: (re.compile(trie_pattern(list(value))), value)
+            for key, value in subfields.items()
+        }
+
+    @classmethod
+    def from_file(cls, file: str | None = None) -> "RewriteRules":
+        """
+        Reads rules from a TOML file. The rules packaged with naxos_reconcile
+        are used if no file is given.
+        """
+        with open(file or DEFAULT_RULES, "rb") as rules_file:
+            return cls(tomllib.load(rules_file))
+
+    def _edit_url(self, match: re.Match) -> str:
+        return match.group(1) + self.urls[match.group(2).lower()]
+
+    def edit_subfield(self, tag: str, code: str, text: str) -> str:
+        """apply url and subfield rules to the text of a subfield"""
+        if tag == "856" and code == "u" and self.url_pattern is not None:
+            text = self.url_pattern.sub(self._edit_url, text.strip(), count=1)
+        if (tag, code) in self.subfields:
+            pattern, replacements = self.subfields[(tag, code)]
+            text = pattern.sub(lambda i: replacements[i.group(0)], text)
+        return text
+
+    def edit_record(self, record: ET.Element) -> None:
+        """apply rules to a MARC/XML record in place"""
+        for field in list(record):
+            tag = field.get("tag")
+            if tag in self.drop_tags:
+                record.remove(field)
+                continue
+            if field.tag != f"{MARC_NS}datafield":
+                continue
+            for subfield in field.findall(f"./{MARC_NS}subfield"):
+                if subfield.text is not None:
+                    subfield.text = self.edit_subfield(
+                        tag, subfield.get("code"), subfield.text
+                    )
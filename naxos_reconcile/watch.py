@@ -0,0 +1,154 @@
+import csv
+import os
+import queue
+import stat
+import threading
+import time
+
+import pandas as pd
+
+from naxos_reconcile.prep import read_naxos_file
+from naxos_reconcile.reconcile import (
+    compare_dataframes,
+    read_naxos_csv,
+    read_sierra_csv,
+)
+from naxos_reconcile.rules import RewriteRules
+from naxos_reconcile.utils import save_csv
+
+
+class NaxosWatcher:
+    """
+    Watches a directory for new Naxos MARC/XML files. New files are prepped
+    by a fixed number of worker threads and data is appended to the prepped
+    Naxos .csv file. Files are passed to the workers through a bounded queue
+    so a large delivery is processed a few files at a time.
+
+    All output is written to `outdir` (by default a "prepped" directory in the
+    watched directory) rather than to a dated directory so that a watcher can
+    run for several days. Names of prepped files are saved to the same
+    directory so that files are not prepped again if the watcher is restarted.
+
+    If a prepped Sierra file is given it is read once and the Sierra and Naxos
+    data are compared each time new Naxos files have been prepped. Compare
+    output is also written to `outdir`.
+    """
+
+    def __init__(
+        self,
+        dir: str,
+        outdir: str | None = None,
+        sierra_file: str | None = None,
+        rules_file: str | None = None,
+        workers: int = 2,
+        queue_size: int = 10,
+    ):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, not {workers}")
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be at least 1, not {queue_size}")
+        self.dir = dir
+        self.outdir = outdir or f"{dir}/prepped"
+        if not os.path.exists(self.outdir):
+            os.makedirs(self.outdir)
+        self.rules = RewriteRules.from_file(rules_file)
+        self.naxos_csv = f"{self.outdir}/prepped_naxos_data.csv"
+        self.watched_csv = f"{self.outdir}/watched_naxos_files.csv"
+
+        self.seen = set()
+        if os.path.exists(self.watched_csv):
+            with open(self.watched_csv, "r", encoding="utf-8") as csvfile:
+                self.seen = {row[0] for row in csv.reader(csvfile)}
+        self.stats: dict = {}
+        self.failed: dict = {}
+
+        self.sierra_df = None
+        self.naxos_df = pd.DataFrame(columns=["URL_NAXOS", "CONTROL_NO", "CID_NAXOS"])
+        if sierra_file:
+            self.sierra_df = read_sierra_csv(sierra_file)
+            if os.path.exists(self.naxos_csv):
+                self.naxos_df = read_naxos_csv(self.naxos_csv)
+        self.new_rows: list = []
+
+        self.lock = threading.Lock()
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def new_files(self) -> list:
+        """
+        Returns names of .xml files in the directory that have not been
+        prepped. Files are only returned once their size and modification time
+        are the same in two polls so that files that are still being copied
+        are skipped. Files that could not be prepped are returned again once
+        they have changed. Files that are moved or removed while the directory
+        is read are skipped.
+        """
+        files = []
+        for file in sorted(os.listdir(self.dir)):
+            if not file.endswith(".xml") or file in self.seen:
+                continue
+            try:
+                file_stat = os.stat(f"{self.dir}/{file}")
+            except OSError:
+                self.stats.pop(file, None)
+                continue
+            if not stat.S_ISREG(file_stat.st_mode):
+                continue
+            file_id = (file_stat.st_size, file_stat.st_mtime_ns)
+            if self.failed.get(file) == file_id:
+                continue
+            if self.stats.get(file) == file_id:
+                files.append(file)
+            self.stats[file] = file_id
+        return files
+
+    def _worker(self) -> None:
+        while True:
+            file, file_id = self.queue.get()
+            try:
+                rows = list(read_naxos_file(f"{self.dir}/{file}", self.rules))
+                with self.lock:
+                    for row in rows:
+                        save_csv(self.naxos_csv, row)
+                    save_csv(self.watched_csv, [file])
+                    self.seen.add(file)
+                    self.failed.pop(file, None)
+                    self.new_rows.extend(rows)
+                print(f"Prepped {file}")
+            except Exception as exc:
+                with self.lock:
+                    self.failed[file] = file_id
+                print(f"Unable to prep {file}: {exc!r}")
+            finally:
+                self.queue.task_done()
+
+    def poll(self) -> list:
+        """
+        Preps any new files in the directory and compares the prepped data
+        with the Sierra data if new rows were added.
+
+        Returns:
+            names of files that were sent to be prepped as list
+        """
+        files = self.new_files()
+        for file in files:
+            self.queue.put((file, self.stats.pop(file)))
+        self.queue.join()
+
+        with self.lock:
+            rows, self.new_rows = self.new_rows, []
+        if rows and self.sierra_df is not None:
+            new_df = pd.DataFrame(rows, columns=self.naxos_df.columns, dtype=str)
+            self.naxos_df = pd.concat([self.naxos_df, new_df], ignore_index=True)
+            print("Comparing files")
+            compare_dataframes(
+                sierra_df=self.sierra_df, naxos_df=self.naxos_df, outdir=self.outdir
+            )
+        return files
+
+    def run(self, interval: int = 60) -> None:
+        """poll the directory every `interval` seconds"""
+        while True:
+            self.poll()
+            time.sleep(interval)
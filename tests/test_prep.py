@@ -1,11 +1,13 @@
 import csv
+import os
 import xml.etree.ElementTree as ET
-from pymarc import MARCReader
+from pymarc import MARCReader, Record, Field, Subfield, record_to_xml_node
 import pytest
 
 from naxos_reconcile.prep import (
     combine_naxos_xml,
     edit_naxos_xml,
+    extract_naxos_csv,
     naxos_xml_to_marc,
     prep_naxos_csv,
     prep_sierra_csv,
@@ -96,6 +98,96 @@ def test_prep_naxos_csv(test_marc_xml, test_date_directory, mock_date_directory)
     assert len(control_nos) == 6
 
 
+def test_extract_naxos_csv(test_marc_xml, test_date_directory, mock_date_directory):
+    for i in range(3):
+        out = out_file(f"test_{i}.xml")
+        test_marc_xml.write(
+            out,
+            encoding="utf-8",
+            xml_declaration=True,
+        )
+
+    test_csv = extract_naxos_csv(test_date_directory)
+    urls = []
+    control_nos = []
+    cids = []
+    with open(test_csv, "r") as csv_file:
+        reader = csv.reader(csv_file, delimiter=",")
+        for row in reader:
+            urls.append(row[0])
+            control_nos.append(row[1])
+            cids.append(row[2])
+    assert "prepped_naxos_data.csv" in test_csv
+    assert len(control_nos) == 6
+    assert control_nos == ["123456789"] * 6
+    assert sorted(cids) == ["bar", "bar", "bar", "foo", "foo", "foo"]
+    assert "http://nypl.naxosmusiclibrary.com/catalogue/item.asp?cid=foo" in urls
+
+
+@pytest.mark.parametrize(
+    "rules",
+    [
+        None,
+        'drop_tags = ["505", "856"]\n',
+        'drop_tags = ["001"]\n',
+        '[[url]]\nfind = "univportal.naxosmusiclibrary.com"\nreplace = "bpl.naxosmusiclibrary.com"\n',
+    ],
+)
+def test_extract_naxos_csv_matches_prep_naxos_csv(
+    test_marc_xml, rules, tmpdir, test_date_directory, mock_date_directory
+):
+    def _record(control_nos, urls):
+        record = Record()
+        for control_no in control_nos:
+            record.add_field(Field(tag="001", data=control_no))
+        for url in urls:
+            record.add_field(
+                Field(
+                    tag="856",
+                    indicators=["4", "0"],
+                    subfields=[Subfield(code="u", value=url)],
+                )
+            )
+        return record_to_xml_node(record, namespace=True)
+
+    def _rows(file):
+        if not os.path.exists(file):
+            return []
+        with open(file, "r") as csv_file:
+            rows = [row for row in csv.reader(csv_file)]
+        os.remove(file)
+        return rows
+
+    rules_file = None
+    if rules:
+        rules_file = str(tmpdir.join("rules.toml"))
+        with open(rules_file, "w") as toml_file:
+            toml_file.write(rules)
+    root = test_marc_xml.getroot()
+    root.append(
+        _record(["987654321"], ["http://univportal.naxosmusiclibrary.com/item.asp"])
+    )
+    root.append(
+        _record(
+            ["111", "222"],
+            ["http://univportal.naxosmusiclibrary.com/item.asp?cid=baz"],
+        )
+    )
+    naxos_dir = tmpdir.mkdir("naxos")
+    test_marc_xml.write(
+        f"{naxos_dir}/test.xml",
+        encoding="utf-8",
+        xml_declaration=True,
+    )
+
+    extracted = _rows(extract_naxos_csv(str(naxos_dir), rules_file))
+    edited_xml = edit_naxos_xml(combine_naxos_xml(str(naxos_dir)), rules_file)
+    prepped = _rows(prep_naxos_csv(edited_xml))
+    assert extracted == prepped
+    if rules is None:
+        assert [row[2] for row in extracted] == ["bar", "foo"]
+
+
 def test_prep_sierra_csv(test_date_directory, mock_date_directory):
     file = "tests/test_csv.csv"
     test_csv = prep_sierra_csv(file)
@@ -0,0 +1,186 @@
+import re
+import xml.etree.ElementTree as ET
+import pytest
+
+from naxos_reconcile.rules import RewriteRules, trie_pattern
+from naxos_reconcile.utils import out_file
+
+MARC_NS = "{http://www.loc.gov/MARC21/slim}"
+
+
+@pytest.fixture
+def test_rules() -> RewriteRules:
+    return RewriteRules(
+        {
+            "drop_tags": ["024", "505"],
+            "url": [
+                {
+                    "find": "univportal.naxosmusiclibrary.com",
+                    "replace": "nypl.naxosmusiclibrary.com",
+                },
+                {
+                    "find": "univportal.naxosmusiclibrary.com/catalogue/",
+                    "replace": "nypl.naxosmusiclibrary.com/catalogue/nypl/",
+                },
+                {
+                    "find": "univportal.naxosvideolibrary.com",
+                    "replace": "nypl.naxosvideolibrary.com",
+                },
+            ],
+            "subfield": [
+                {"tag": "856", "code": "u", "find": "http://", "replace": "https://"},
+                {"tag": "856", "code": "z", "find": "Univ", "replace": "NYPL"},
+            ],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "word",
+    ["abc", "abd", "ab", "x.y"],
+)
+def test_trie_pattern(word):
+    pattern = trie_pattern(["abc", "abd", "ab", "x.y"])
+    assert pattern == r"(?:ab(?:c|d)?|x\.y)"
+    assert re.fullmatch(pattern, word) is not None
+    assert re.fullmatch(pattern, "xay") is None
+
+
+def test_rewrite_rules_from_file():
+    rules = RewriteRules.from_file()
+    assert rules.drop_tags == {"505"}
+    assert (
+        rules.edit_subfield(
+            "856",
+            "u",
+            "http://univportal.naxosmusiclibrary.com/catalogue/item.asp?cid=foo",
+        )
+        == "http://nypl.naxosmusiclibrary.com/catalogue/item.asp?cid=foo"
+    )
+
+
+def test_rewrite_rules_from_file_toml(tmpdir):
+    rules_file = tmpdir.join("rules.toml")
+    rules_file.write(
+        'drop_tags = ["024"]\n'
+        "[[url]]\n"
+        'find = "univportal.naxosmusiclibrary.com"\n'
+        'replace = "bpl.naxosmusiclibrary.com"\n'
+    )
+    rules = RewriteRules.from_file(str(rules_file))
+    assert rules.drop_tags == {"024"}
+    assert (
+        rules.edit_subfield("856", "u", "https://univportal.naxosmusiclibrary.com/a")
+        == "https://bpl.naxosmusiclibrary.com/a"
+    )
+
+
+@pytest.mark.parametrize(
+    "tag, code, text, expected",
+    [
+        (
+            "856",
+            "u",
+            "http://univportal.naxosmusiclibrary.com/catalogue/item.asp?cid=foo",
+            "https://nypl.naxosmusiclibrary.com/catalogue/nypl/item.asp?cid=foo",
+        ),
+        (
+            "856",
+            "u",
+            "http://univportal.naxosmusiclibrary.com/item.asp?cid=foo",
+            "https://nypl.naxosmusiclibrary.com/item.asp?cid=foo",
+        ),
+        (
+            "856",
+            "u",
+            "https://univportal.naxosvideolibrary.com/item.asp?cid=foo",
+            "https://nypl.naxosvideolibrary.com/item.asp?cid=foo",
+        ),
+        (
+            "856",
+            "u",
+            "https://example.com/?univportal.naxosmusiclibrary.com",
+            "https://example.com/?univportal.naxosmusiclibrary.com",
+        ),
+        (
+            "856",
+            "u",
+            "http://univportal.naxosmusiclibrary.community/item.asp?cid=foo",
+            "https://univportal.naxosmusiclibrary.community/item.asp?cid=foo",
+        ),
+        (
+            "856",
+            "u",
+            "HTTP://UnivPortal.NaxosMusicLibrary.com/item.asp?cid=foo",
+            "HTTP://nypl.naxosmusiclibrary.com/item.asp?cid=foo",
+        ),
+        (
+            "856",
+            "u",
+            " http://univportal.naxosmusiclibrary.com:443/item.asp?cid=foo ",
+            "https://nypl.naxosmusiclibrary.com:443/item.asp?cid=foo",
+        ),
+        ("856", "z", "Univ access only", "NYPL access only"),
+        ("500", "a", "http://univportal.naxosmusiclibrary.com", None),
+    ],
+)
+def test_rewrite_rules_edit_subfield(test_rules, tag, code, text, expected):
+    assert test_rules.edit_subfield(tag, code, text) == (expected or text)
+
+
+def test_rewrite_rules_edit_record(
+    test_rules, test_marc_xml, test_date_directory, mock_date_directory
+):
+    out = out_file("test.xml")
+    test_marc_xml.write(
+        out,
+        encoding="utf-8",
+        xml_declaration=True,
+    )
+    record = ET.parse(out).getroot().find(f"./{MARC_NS}record")
+    test_rules.edit_record(record)
+    tags = [i.get("tag") for i in record]
+    urls = [
+        i.text
+        for i in record.findall(
+            f"./{MARC_NS}datafield[@tag='856']/{MARC_NS}subfield[@code='u']"
+        )
+    ]
+    assert "505" not in tags
+    assert "024" not in tags
+    assert "001" in tags
+    assert urls == [
+        "https://nypl.naxosmusiclibrary.com/catalogue/nypl/item.asp?cid=bar",
+        "https://nypl.naxosmusiclibrary.com/catalogue/nypl/item.asp?cid=foo",
+    ]
+
+
+@pytest.mark.parametrize(
+    "rules, message",
+    [
+        ({"urls": [{"find": "a", "replace": "b"}]}, "unknown keys ['urls']"),
+        ({"url": {"find": "a", "replace": "b"}}, "Invalid url rules"),
+        ({"url": ["univportal"]}, "Invalid url rules"),
+        ({"subfield": "x"}, "Invalid subfield rules"),
+        ({"drop_tags": [505]}, "drop_tags"),
+        ({"drop_tags": "505"}, "drop_tags"),
+        ({"url": [{"find": "", "replace": "nypl"}]}, "'find' must not be empty"),
+        ({"url": [{"find": "univportal"}]}, "'replace' must be a str"),
+        (
+            {"subfield": [{"tag": 856, "code": "z", "find": "a", "replace": "b"}]},
+            "'tag' must be a str",
+        ),
+        (
+            {"subfield": [{"tag": "856", "find": "a", "replace": "b"}]},
+            "'code' must be a str",
+        ),
+        (
+            {"subfield": [{"tag": "856", "code": "z", "find": "", "replace": "X"}]},
+            "Invalid subfield rule",
+        ),
+    ],
+)
+def test_rewrite_rules_invalid(rules, message):
+    with pytest.raises(ValueError) as exc:
+        RewriteRules(rules)
+    assert message in str(exc.value)
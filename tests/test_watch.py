@@ -0,0 +1,194 @@
+import csv
+import os
+import pandas as pd
+import pytest
+from click.testing import CliRunner
+
+from naxos_reconcile import cli, watch
+from naxos_reconcile.watch import NaxosWatcher
+from naxos_reconcile.utils import out_file
+
+
+def write_naxos_files(tree, dir, names):
+    for name in names:
+        tree.write(
+            f"{dir}/{name}",
+            encoding="utf-8",
+            xml_declaration=True,
+        )
+
+
+def test_naxos_watcher_new_files(
+    test_marc_xml, tmpdir, test_date_directory, mock_date_directory
+):
+    write_naxos_files(test_marc_xml, tmpdir, ["test_0.xml", "test_1.xml"])
+    write_naxos_files(test_marc_xml, tmpdir, ["test_2.xml.part"])
+    tmpdir.mkdir("dir.xml")
+    watcher = NaxosWatcher(str(tmpdir))
+    assert watcher.new_files() == []
+    assert watcher.new_files() == ["test_0.xml", "test_1.xml"]
+
+
+def test_naxos_watcher_new_files_removed(
+    test_marc_xml, tmpdir, monkeypatch, test_date_directory, mock_date_directory
+):
+    write_naxos_files(test_marc_xml, tmpdir, ["test_0.xml", "test_1.xml"])
+    watcher = NaxosWatcher(str(tmpdir))
+    os_stat = os.stat
+
+    def _stat(path, *args, **kwargs):
+        if str(path).endswith("test_0.xml"):
+            raise FileNotFoundError(path)
+        return os_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(watch.os, "stat", _stat)
+    assert watcher.new_files() == []
+    assert watcher.new_files() == ["test_1.xml"]
+
+
+def test_naxos_watcher_bad_file(
+    test_marc_xml, tmpdir, monkeypatch, test_date_directory, mock_date_directory
+):
+    read_naxos_file = watch.read_naxos_file
+
+    def _read_naxos_file(file, rules):
+        if file.endswith("bad.xml"):
+            raise PermissionError(file)
+        return read_naxos_file(file, rules)
+
+    monkeypatch.setattr(watch, "read_naxos_file", _read_naxos_file)
+    write_naxos_files(test_marc_xml, tmpdir, ["bad.xml"])
+    with open(f"{tmpdir}/malformed.xml", "w") as xml_file:
+        xml_file.write("<collection><record>")
+    watcher = NaxosWatcher(str(tmpdir), workers=1, queue_size=1)
+    watcher.poll()
+    assert watcher.poll() == ["bad.xml", "malformed.xml"]
+
+    assert watcher.poll() == []
+    assert watcher.poll() == []
+
+    write_naxos_files(test_marc_xml, tmpdir, ["test_0.xml"])
+    watcher.poll()
+    assert watcher.poll() == ["test_0.xml"]
+    with open(watcher.naxos_csv, "r") as csv_file:
+        rows = [row for row in csv.reader(csv_file)]
+    with open(watcher.watched_csv, "r") as csv_file:
+        files = [row[0] for row in csv.reader(csv_file)]
+    assert len(rows) == 2
+    assert files == ["test_0.xml"]
+
+    write_naxos_files(test_marc_xml, tmpdir, ["malformed.xml"])
+    watcher.poll()
+    assert watcher.poll() == ["malformed.xml"]
+    assert watcher.poll() == []
+    with open(watcher.naxos_csv, "r") as csv_file:
+        rows = [row for row in csv.reader(csv_file)]
+    with open(watcher.watched_csv, "r") as csv_file:
+        files = [row[0] for row in csv.reader(csv_file)]
+    assert len(rows) == 4
+    assert files == ["test_0.xml", "malformed.xml"]
+
+
+@pytest.mark.parametrize(
+    "workers, queue_size",
+    [(0, 1), (1, 0), (-1, 1), (1, -1)],
+)
+def test_naxos_watcher_invalid(
+    workers, queue_size, tmpdir, test_date_directory, mock_date_directory
+):
+    with pytest.raises(ValueError):
+        NaxosWatcher(str(tmpdir), workers=workers, queue_size=queue_size)
+
+
+@pytest.mark.parametrize("option", ["-w", "-q", "-i"])
+def test_watch_command_invalid(option, tmpdir):
+    result = CliRunner().invoke(cli, ["watch", "-n", str(tmpdir), option, "0"])
+    assert result.exit_code == 2
+    assert "Invalid value" in result.output
+
+
+def test_naxos_watcher_poll(
+    test_marc_xml, tmpdir, test_date_directory, mock_date_directory
+):
+    write_naxos_files(test_marc_xml, tmpdir, ["test_0.xml", "test_1.xml"])
+    watcher = NaxosWatcher(str(tmpdir), workers=1, queue_size=1)
+    assert watcher.poll() == []
+    assert watcher.poll() == ["test_0.xml", "test_1.xml"]
+    assert watcher.poll() == []
+
+    write_naxos_files(test_marc_xml, tmpdir, ["test_2.xml"])
+    watcher.poll()
+    assert watcher.poll() == ["test_2.xml"]
+
+    with open(watcher.naxos_csv, "r") as csv_file:
+        rows = [row for row in csv.reader(csv_file)]
+    urls = [row[0] for row in rows]
+    assert len(rows) == 6
+    assert "http://nypl.naxosmusiclibrary.com/catalogue/item.asp?cid=foo" in urls
+    with open(watcher.watched_csv, "r") as csv_file:
+        files = sorted([row[0] for row in csv.reader(csv_file)])
+    assert files == ["test_0.xml", "test_1.xml", "test_2.xml"]
+
+
+def test_naxos_watcher_restart(
+    test_marc_xml, tmpdir, test_date_directory, mock_date_directory
+):
+    write_naxos_files(test_marc_xml, tmpdir, ["test_0.xml"])
+    watcher = NaxosWatcher(str(tmpdir))
+    watcher.poll()
+    assert watcher.poll() == ["test_0.xml"]
+
+    write_naxos_files(test_marc_xml, tmpdir, ["test_1.xml"])
+    restarted = NaxosWatcher(str(tmpdir))
+    restarted.poll()
+    assert restarted.poll() == ["test_1.xml"]
+    assert restarted.naxos_csv == f"{tmpdir}/prepped/prepped_naxos_data.csv"
+    assert not os.path.exists(out_file("prepped_naxos_data.csv"))
+
+
+def test_naxos_watcher_outdir(
+    test_marc_xml, tmpdir, test_date_directory, mock_date_directory
+):
+    write_naxos_files(test_marc_xml, tmpdir, ["test_0.xml"])
+    watcher = NaxosWatcher(str(tmpdir), outdir=str(tmpdir.join("out")))
+    watcher.poll()
+    watcher.poll()
+    assert sorted(os.listdir(tmpdir.join("out"))) == [
+        "prepped_naxos_data.csv",
+        "watched_naxos_files.csv",
+    ]
+
+
+def test_naxos_watcher_compare(
+    test_marc_xml, tmpdir, test_date_directory, mock_date_directory
+):
+    sierra_df = pd.DataFrame(
+        [
+            [
+                "123",
+                "456",
+                "https://nypl.naxosmusiclibrary.com/catalogue/item.asp?cid=foo",
+                "foo",
+            ],
+            [
+                "987",
+                "654",
+                "https://nypl.naxosmusiclibrary.com/catalogue/item.asp?cid=baz",
+                "baz",
+            ],
+        ]
+    )
+    sierra_df.to_csv(out_file("sierra.csv"), index=False, header=False)
+    write_naxos_files(test_marc_xml, tmpdir, ["test_0.xml"])
+    watcher = NaxosWatcher(str(tmpdir), sierra_file=out_file("sierra.csv"))
+    watcher.poll()
+    assert not os.path.exists(f"{watcher.outdir}/records_to_import.csv")
+    watcher.poll()
+
+    import_df = pd.read_csv(f"{watcher.outdir}/records_to_import.csv", dtype=str)
+    delete_df = pd.read_csv(f"{watcher.outdir}/records_to_delete.csv", dtype=str)
+    check_df = pd.read_csv(f"{watcher.outdir}/combined_urls_to_check.csv", dtype=str)
+    assert not os.path.exists(out_file("records_to_import.csv"))
+    assert import_df["CID_NAXOS"].tolist() == ["bar"]
+    assert delete_df["CID_SIERRA"].tolist() == ["baz"]
+    assert check_df["CID_SIERRA"].tolist() == ["foo"]